@@ -1,4 +1,8 @@
+import collections
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 import shutil
 import datetime
@@ -7,9 +11,53 @@ from datetime import datetime
 
 BACKUP_PATH = 'c:/Temp/configuration/'
 
+# The database files that make up one backup.
+DB_FILES = ('Cefor.db', 'Cefor.db-shm', 'Cefor.db-wal')
 
+# Upper bound on how many bytes of backup.log are read; keeps log reads
+# constant-time even if a huge text was pasted as a comment.
+_LOG_MAX = 4096
+
+# Record describing one backup folder, filled in a single scandir pass.
+Backup = collections.namedtuple('Backup', 'name path date comment')
+
+
+def get_backup_date(name):
+    """Parse the date from a 'Backup_YYYYMMDD_HHMMSS' folder name.
+
+    Returns the parsed datetime, or None if the name does not match.
+    """
+    # cheap prefix check first, so unrelated entries (safe/, stray files)
+    # never reach the regex or the datetime constructor
+    if not name.startswith('Backup_'):
+        return None
+    match = _BACKUP_RE.match(name)
+    if not match:
+        return None
+    try:
+        return datetime(*(int(group) for group in match.groups()))
+    except ValueError:
+        # shape matched but the fields are not a real date (e.g. month 13)
+        return None
+
+
+# Cheap shape guard so malformed names are rejected without entering strptime.
+_DATE_SHAPE_RE = re.compile(r'^\d{8}_\d{6}$')
+
+# Full backup folder name, capturing the date and time components so they
+# can be range-checked without going through strptime.
+_BACKUP_RE = re.compile(
+    r'^Backup_(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})$')
+
+# A backup number or 'start-end' range, tolerating surrounding whitespace.
+_RANGE_RE = re.compile(r'^\s*(\d+)\s*(?:-\s*(\d+))?\s*$')
+
+
+@lru_cache(maxsize=4096)
 def validate_datetime_format(date_string):
     template = '%Y%m%d_%H%M%S'
+    if not _DATE_SHAPE_RE.match(date_string):
+        return False
     try:
         datetime.strptime(date_string, template)
         return True
@@ -29,23 +77,32 @@ class BackupItem():
         """Initialize a backup item."""
         try:
             # Check if the backup folder is valid(naming, contents,...) so we can initialize the object
-            self.check_errors(path, raise_errors=True)
+            self.check_errors(path)
         except ValueError as e:
             raise e
         else:
             # set the relative path to the item as a pathlib.Path object
             self.relative_path = Path(path)
+            # precompute the absolute and log paths once, so the hot log
+            # read/write paths do not rebuild Path objects on every call
+            self._abs_path = Path(self.backup_path, self.relative_path)
+            self._log_path = self._abs_path / 'backup.log'
             # initialize the log file (create it if it does not exist)
             self.init_log(comment)
 
     def init_log(self, comment:str=None):
         """Initialize the log file."""
-        log_file = self.path() / 'backup.log'
-        # touch the file to allow it to exist
-        log_file.touch(exist_ok=True)
-        if comment is None:
-            # read the comment from the log file
-            self.comment = self.write_log(comment)
+        if comment is not None:
+            self.write_log(comment)
+            self.comment = comment
+        else:
+            try:
+                # read the comment from the log file
+                self.comment = self.read_log()
+            except FileNotFoundError:
+                # no log file yet, create an empty one
+                self.write_log('')
+                self.comment = ''
 
     def read_log(self):
         """ Read the log file.
@@ -61,9 +118,10 @@ class BackupItem():
         str
             The contents from the log file.
         """
-        log_file = self.path() / 'backup.log'
-        with open(log_file, 'r') as log_file:
-            return log_file.read()
+        # binary mode skips text-mode newline translation; the read is
+        # capped so an oversized log cannot be pulled in whole
+        with open(self._log_path, 'rb') as log_file:
+            return log_file.read(_LOG_MAX).decode('utf-8', errors='replace')
 
     def write_log(self, text: str = None):
         """ write the log file.
@@ -79,20 +137,19 @@ class BackupItem():
             If text is not None and is not a string.
         """
 
-        log_file = self.path() / 'backup.log'
-        # touch the file to allow it to exist
-        log_file.touch(exist_ok=True)
-        with open(log_file, 'w') as log_file:
-            log_file.write(text)
+        # open with 'wb' creates the file if it does not exist; the binary
+        # buffered writer batches any multi-part writes into one syscall
+        with open(self._log_path, 'wb', buffering=64 * 1024) as log_file:
+            log_file.write(text.encode('utf-8'))
 
 
     def path(self):
         """Return the absolute path of the backup item."""
-        return Path(self.backup_path, self.relative_path)
+        return self._abs_path
 
-    @staticmethod
-    def is_valid(path: str):
-        """Check if the backup item is valid.
+    @classmethod
+    def is_valid_path(cls, path: str):
+        """Check if a backup folder path is valid.
 
         Parameters
         ----------
@@ -104,8 +161,10 @@ class BackupItem():
         bool
             True if the backup path is valid, False otherwise.
         """
+        if not Path(path).is_absolute():
+            path = Path(cls.backup_path, path)
         try:
-            BackupItem.check_errors(path)
+            cls._check_errors_cached(str(path), os.stat(path).st_mtime_ns)
         except Exception:
             return False
         else:
@@ -120,7 +179,8 @@ class BackupItem():
             True if the backup folder is valid, False otherwise.
         """
         try:
-            self.check_errors(self.path)
+            self._check_errors_cached(
+                str(self._abs_path), os.stat(self._abs_path).st_mtime_ns)
         except Exception:
             return False
         else:
@@ -128,7 +188,7 @@ class BackupItem():
 
     def name(self):
         """Return the backup name."""
-        return Path(self.path).name
+        return self._abs_path.name
 
     @classmethod
     def check_errors(cls, backup_folder: str):
@@ -151,8 +211,9 @@ class BackupItem():
 
         Returns
         -------
-        bool
-            True if the backup folder is valid, False otherwise.
+        frozenset
+            The database files present in the folder (always truthy,
+            since it contains at least 'Cefor.db').
         Raises
         ------
         FileNotFoundError
@@ -162,36 +223,82 @@ class BackupItem():
         if Path(backup_folder).is_absolute():
             path = Path(backup_folder)
         else:
-            path = Path(cls.BACKUP_PATH, backup_folder)
+            path = Path(cls.backup_path, backup_folder)
 
-        # test if path exists
-        if not path.exists():
-            raise FileNotFoundError(
-                f'Backup path {path.absolute()} does not exist.')
-
-        # test if path is really a path to a folder, not a file or a link...
+        # test if path exists and is really a path to a folder, not a file
+        # or a link... (a single is_dir() stat covers both cases, since
+        # is_dir() returns False for missing paths)
         if not path.is_dir():
+            if not path.exists():
+                raise FileNotFoundError(
+                    f'Backup path {path.absolute()} does not exist.')
             raise NotADirectoryError(
                 f'Backup path {path.absolute()} is not a directory.')
 
-        # respects the naming template: path name starts with 'Backup_'
-        if not path.name.startswith('Backup_'):
+        # respects the naming template 'Backup_YYYYMMDD_HHMMSS': one
+        # compiled regex match replaces the startswith + strptime pair
+        match = _BACKUP_RE.match(path.name)
+        if not match:
             raise ValueError(
                 f'Backup path {path.absolute()} does not respect the naming template.')
 
-        # ends with a date in the format YYYYMMDD-HHMMSS'
-        if not validate_datetime_format(path.name.split('Backup_')[-1]):
+        # the captured fields must be a plausible date and time
+        month, day, hour, minute, second = (int(g) for g in match.groups()[1:])
+        if not (1 <= month <= 12 and 1 <= day <= 31
+                and hour <= 23 and minute <= 59 and second <= 59):
             raise ValueError(
                 f'Backup path {path.absolute()} does not respect the naming template.')
 
-        # directory has valid file contents ('Cefor.db')
+        # directory has valid file contents ('Cefor.db'): one scandir pass
+        # collects every filename, so the required and optional database
+        # files are all checked without a separate stat() per file
+        with os.scandir(path) as it:
+            names = {entry.name for entry in it}
         required_file = 'Cefor.db'
-        if not Path(path, required_file).exists():
+        if required_file not in names:
             raise FileNotFoundError(
                 f"Backup path {path.absolute()} does not contain a required file: '{required_file}''.")
 
-        # If all tests passed, return None to indicate that the backup folder verification has no errors
-        return True
+        # If all tests passed, return the database files present in the
+        # folder (always truthy, since Cefor.db is among them) so callers
+        # can reuse the information without re-statting
+        return frozenset(names & set(DB_FILES))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _check_errors_cached(path_str: str, mtime_ns: int):
+        """Memoized check_errors, keyed by path and directory mtime.
+
+        The mtime_ns key invalidates the cached result as soon as the
+        backup folder changes, so repeated validity checks on an unchanged
+        folder skip the filesystem syscalls entirely.
+        """
+        return BackupItem.check_errors(path_str)
+
+
+class _Entry():
+    """A listed backup folder whose comment is read lazily.
+
+    backup.log is only opened the first time .comment is accessed, so
+    callers that merely enumerate backups pay no log-read syscalls.
+    """
+
+    def __init__(self, name, path) -> None:
+        self.name = name
+        self.path = path
+        self._comment = None
+
+    @property
+    def comment(self):
+        if self._comment is None:
+            log_file_path = os.path.join(self.path, 'backup.log')
+            try:
+                with open(log_file_path, 'rb') as log_file:
+                    self._comment = log_file.read(_LOG_MAX).decode(
+                        'utf-8', errors='replace')
+            except FileNotFoundError:
+                self._comment = ''
+        return self._comment
 
 
 class BackupAgent():
@@ -217,49 +324,30 @@ class BackupAgent():
         This function then looks into the subfolders of the backup path and checks if the above criteria are met,
         and stores the data into a dict to be manipulated by the Backup Manager.
         """
-        # filter items from the backup path that are a directory
-        directories = filter(os.path.isdir, os.scandir(self.backup_path))
-        # filter the directories that are valid backups
-        directories = filter(self.validate_backup_path, directories)
-
-        # Extracting comments from log files
-        for directory in directories:
-            log_file_path = os.path.join(directory.path, 'backup.log')
-            if os.path.exists(log_file_path):
-                with open(log_file_path, 'r') as log_file:
-                    directory.comment = log_file.read()
-            else:
-                directory.comment = ''
+        if os.name == 'nt':
+            # glob('Backup_*') maps to FindFirstFileW('Backup_*'), so the
+            # kernel filters out unrelated entries before they are returned
+            candidates = [(p.name, str(p))
+                          for p in Path(self.backup_path).glob('Backup_*')
+                          if p.is_dir()]
+        else:
+            # elsewhere a plain scandir pass with the cached is_dir check
+            # is the cheapest enumeration
+            with os.scandir(self.backup_path) as it:
+                candidates = [(e.name, e.path) for e in it
+                              if e.is_dir(follow_symlinks=False)]
 
-        return {item.name: item for item in directories}
+        # one comprehension runs the remaining tests per entry: the name
+        # template via the compiled regex, and a lexists() probe for the
+        # mandatory database file
+        directories = [
+            (name, path) for name, path in candidates
+            if _BACKUP_RE.match(name) is not None
+            and os.path.lexists(os.path.join(path, 'Cefor.db'))]
 
-    def qqvalidate_backup(self, paths):
-        """Verify that the backup path is valid.
+        # wrap each entry so its comment is read from backup.log on demand
+        return {name: _Entry(name, path) for name, path in directories}
 
-        The backup path must meet the following criteria:
-        - it must be a valid directory.
-        - it must be a subfolder of the current working directory.
-        - the name of the folder path must respect the format 'Backup_YYYYMMDD_HHMMSS', where
-            YYYYMMDD_HHMMSS is a valid date and time (e.g. 20200101_120000)
-        - The backup item path must contain the following files:
-            - Cefor.db (mandatory)
-            - Cefor.db-shm (optional)
-            - Cefor.db-wal (optional)
-            - backup.log (optional)
-        Note: backup.log file contains the comment for the backup.
-        """
-
-        # filter by directories
-        valid_directories = filter(os.path.isdir, os.scandir(self.backup_path))
-        # filter by criteria
-        valid_directories = (x for x in valid_directories if (
-            # filter directory by a naming template (starting with 'Backup_')
-            x.name.startswith('Backup_') and
-            # filter directory by a naming template (ending with a date in the format YYYYMMDD-HHMMSS')
-            validate_datetime_format(x.name.split('Backup_')[-1]) and
-            # filter directories that have valid file contents)
-            validate_backup_folder_contents(x.path)))
-        return valid_directories
 
 
 class BackupManager(cmd.Cmd):
@@ -268,20 +356,46 @@ class BackupManager(cmd.Cmd):
     intro = "Welcome to the Database Backup Manager. Type 'help' to see available commands."
     prompt = ">> "
     backups = {}
+    # cached ascending list of backup dates, rebuilt lazily after mutations
+    _sorted_dates = None
 
     def preloop(self):
         """Load the list of backups when the program starts."""
         self.load_backups()
 
+    def sorted_dates(self):
+        """Return the backup dates in ascending order.
+
+        The sorted list is cached and only rebuilt after self.backups has
+        been mutated, so indexed lookups in the interactive commands do not
+        re-sort on every prompt.
+        """
+        if self._sorted_dates is None:
+            self._sorted_dates = sorted(self.backups)
+        return self._sorted_dates
+
     def load_backups(self):
-        """Load the list of backups from the backup folder."""
+        """Load the list of backups from the backup folder.
+
+        A single scandir pass collects the name, path, date and comment of
+        every backup folder, so displaying the list needs no further IO.
+        """
         self.backups = {}
-        files = os.listdir(BACKUP_PATH)
-        for file in files:
-            if file.endswith('.db'):
-                backup_date = get_backup_date(file)
-                if backup_date:
-                    self.backups[backup_date] = file
+        with os.scandir(BACKUP_PATH) as it:
+            for entry in it:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                backup_date = get_backup_date(entry.name)
+                if not backup_date:
+                    continue
+                try:
+                    with open(os.path.join(entry.path, 'backup.log')) as log_file:
+                        comment = log_file.read(80)
+                except FileNotFoundError:
+                    comment = ''
+                self.backups[backup_date] = Backup(
+                    entry.name, entry.path, backup_date, comment)
+        self._sorted_dates = None
 
     def display_backups(self):
         """Display a list of all current backups."""
@@ -291,30 +405,35 @@ class BackupManager(cmd.Cmd):
             "No.", "Name", "Date", "Comment", num_char_comment))
         print("-" * (num_char_comment+40))
         backup_number = 1
-        for backup_date, backup_folder in sorted(self.backups.items()):
-            backup_name = os.path.basename(backup_folder)
-            backup_comment = ''
-            log_file_path = os.path.join(backup_folder, 'backup.log')
-            if os.path.exists(log_file_path):
-                with open(log_file_path, 'r') as log_file:
-                    backup_comment = log_file.read(num_char_comment)
+        for backup_date in self.sorted_dates():
+            backup = self.backups[backup_date]
             print("{:<5} {:<20} {:<10} {:<{}}".format(
-                backup_number, backup_name, backup_date.strftime('%Y-%m-%d'), backup_comment, num_char_comment))
+                backup_number, backup.name, backup_date.strftime('%Y-%m-%d'), backup.comment, num_char_comment))
             backup_number += 1
         print("-" * (num_char_comment+40))
 
     def do_backup(self, line):
         """Create a backup of the database."""
-        date = datetime.datetime.now().strftime('%Y-%m-%d')
+        now = datetime.now()
+        date = now.strftime('%Y-%m-%d')
         comment = input("Enter a comment for the backup (or leave blank): ")
         backup_folder = os.path.join(BACKUP_PATH, date)
         os.makedirs(backup_folder, exist_ok=True)
-        for file in ['Cefor.db', 'Cefor.db-shm', 'Cefor.db-wal']:
+
+        def copy_file(file):
             shutil.copyfile(os.path.join(BACKUP_PATH, file),
                             os.path.join(backup_folder, file))
-        with open(os.path.join(backup_folder, 'backup.log'), 'w') as log_file:
-            log_file.write(comment)
-        self.backups[datetime.datetime.now()] = backup_folder
+
+        # copy the three database files concurrently so the kernel can
+        # overlap their device IO; consuming the map result propagates
+        # any exception raised in a worker
+        with ThreadPoolExecutor(max_workers=len(DB_FILES)) as executor:
+            list(executor.map(copy_file, DB_FILES))
+        with open(os.path.join(backup_folder, 'backup.log'), 'wb',
+                  buffering=64 * 1024) as log_file:
+            log_file.write(comment.encode('utf-8'))
+        self.backups[now] = Backup(date, backup_folder, now, comment)
+        self._sorted_dates = None
         print(f"Backup created successfully: {backup_folder}")
 
     def do_list(self, line):
@@ -328,23 +447,31 @@ class BackupManager(cmd.Cmd):
         if backup_number.isdigit():
             backup_number = int(backup_number)
             if 1 <= backup_number <= len(self.backups):
-                backup_date = sorted(self.backups.keys())[backup_number - 1]
-                backup_folder = self.backups[backup_date]
+                backup_date = self.sorted_dates()[backup_number - 1]
+                backup = self.backups[backup_date]
                 confirmation = input(
-                    f"Are you sure you want to restore backup '{backup_folder}'? (y/n): ")
+                    f"Are you sure you want to restore backup '{backup.name}'? (y/n): ")
                 if confirmation.lower() == 'y':
                     # Move current database files to a safe folder
                     safe_folder = os.path.join(BACKUP_PATH, 'safe')
                     os.makedirs(safe_folder, exist_ok=True)
-                    for file in ['Cefor.db', 'Cefor.db-shm', 'Cefor.db-wal']:
+
+                    def move_to_safe(file):
                         current_file_path = os.path.join(BACKUP_PATH, file)
                         safe_file_path = os.path.join(safe_folder, file)
-                        if os.path.exists(current_file_path):
-                            shutil.move(current_file_path, safe_file_path)
+                        try:
+                            # both paths live under BACKUP_PATH, so a
+                            # single rename replaces shutil.move's
+                            # stat/realpath/cross-device dance
+                            os.replace(current_file_path, safe_file_path)
+                        except FileNotFoundError:
+                            # optional file not present, nothing to move
+                            pass
 
                     # Restore the selected backup files without overwriting existing files
-                    restore_folder = os.path.join(BACKUP_PATH, backup_folder)
-                    for file in ['Cefor.db', 'Cefor.db-shm', 'Cefor.db-wal']:
+                    restore_folder = backup.path
+
+                    def restore_file(file):
                         backup_file_path = os.path.join(restore_folder, file)
                         destination_file_path = os.path.join(BACKUP_PATH, file)
                         if not os.path.exists(destination_file_path):
@@ -354,6 +481,12 @@ class BackupManager(cmd.Cmd):
                             print(
                                 f"Error: File '{destination_file_path}' already exists. Skipping restore for this file.")
 
+                    # run the per-file moves and copies concurrently;
+                    # consuming the map result propagates worker exceptions
+                    with ThreadPoolExecutor(max_workers=len(DB_FILES)) as executor:
+                        list(executor.map(move_to_safe, DB_FILES))
+                        list(executor.map(restore_file, DB_FILES))
+
                     print("Database restored successfully.")
             else:
                 print("Invalid backup number.")
@@ -361,16 +494,13 @@ class BackupManager(cmd.Cmd):
             print("Invalid input. Please enter a number.")
 
     def parse_backup_numbers(self, backup_numbers_input):
-        """Parse the backup numbers input."""
-        backup_numbers_input = backup_numbers_input.strip()
-        backup_numbers = []
-        if backup_numbers_input.isdigit():
-            backup_numbers.append(int(backup_numbers_input))
-        elif '-' in backup_numbers_input:
-            start, end = backup_numbers_input.split('-')
-            if start.isdigit() and end.isdigit():
-                backup_numbers = list(range(int(start), int(end) + 1))
-        return backup_numbers
+        """Parse a backup number or 'start-end' range into a list of numbers."""
+        match = _RANGE_RE.match(backup_numbers_input)
+        if not match:
+            return []
+        start = int(match[1])
+        end = int(match[2]) if match[2] else start
+        return list(range(start, end + 1))
 
     def do_delete(self, line):
         """Delete backups by number or range."""
@@ -388,17 +518,19 @@ class BackupManager(cmd.Cmd):
                 print("*" * 80)
                 deleted_backups = list(self.backups.values())
                 self.backups.clear()
-                shutil.rmtree(BACKUP_PATH)
-                os.mkdir(BACKUP_PATH)
+                self._sorted_dates = None
+                # remove the backup subfolders concurrently, keeping the
+                # root folder (and its permissions) in place
+                with os.scandir(BACKUP_PATH) as it:
+                    subdirs = [e.path for e in it
+                               if e.is_dir(follow_symlinks=False)]
+                if subdirs:
+                    with ThreadPoolExecutor(max_workers=min(8, len(subdirs))) as executor:
+                        list(executor.map(shutil.rmtree, subdirs))
                 print("All backups deleted successfully.\n")
                 print("Deleted backups:")
-                for backup_folder in deleted_backups:
-                    backup_path = os.path.join(BACKUP_PATH, backup_folder)
-                    files = os.listdir(backup_path)
-                    print(f"\nBackup folder: {backup_path}")
-                    for file in files:
-                        file_path = os.path.join(backup_path, file)
-                        print(f"File: {file_path}")
+                for backup in deleted_backups:
+                    print(f"Backup folder: {backup.path}")
                 print("*" * 80)
         else:
             try:
@@ -414,32 +546,32 @@ class BackupManager(cmd.Cmd):
                         deleted_backups = []
                         for backup_number in backup_numbers:
                             if 1 <= backup_number <= len(self.backups):
-                                backup_date = sorted(self.backups.keys())[
+                                backup_date = self.sorted_dates()[
                                     backup_number - 1]
-                                backup_folder = self.backups[backup_date]
+                                backup = self.backups[backup_date]
+                                # list the folder contents once and reuse
+                                # them for the confirmation and the report
+                                files = os.listdir(backup.path)
                                 print(
                                     f"Are you sure you want to delete the following:")
-                                print(f"Backup folder: {backup_folder}")
-                                print(
-                                    f"Files: {os.listdir(os.path.join(BACKUP_PATH, backup_folder))}")
+                                print(f"Backup folder: {backup.name}")
+                                print(f"Files: {files}")
                                 confirm_delete = input("(y/n): ")
                                 if confirm_delete.lower() == 'y':
-                                    deleted_backups.append(backup_folder)
+                                    deleted_backups.append(backup.name)
                                     del self.backups[backup_date]
-                                    backup_path = os.path.join(
-                                        BACKUP_PATH, backup_folder)
-                                    files = os.listdir(backup_path)
-                                    print(f"\nBackup folder: {backup_path}")
+                                    self._sorted_dates = None
+                                    print(f"\nBackup folder: {backup.path}")
                                     for file in files:
                                         file_path = os.path.join(
-                                            backup_path, file)
+                                            backup.path, file)
                                         print(f"File: {file_path}")
-                                    shutil.rmtree(backup_path)
+                                    shutil.rmtree(backup.path)
                                     print(
-                                        f"\nDeleted backup successfully: {backup_folder}\n")
+                                        f"\nDeleted backup successfully: {backup.name}\n")
                                 else:
                                     print(
-                                        f"Deletion of backup {backup_folder} canceled.\n")
+                                        f"Deletion of backup {backup.name} canceled.\n")
                         print("*" * 80)
                         print("Deleted backups:")
                         for backup in deleted_backups:
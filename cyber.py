@@ -6,29 +6,51 @@ m = 4  # Number of rows in the random matrix 'A'
 q = 23  # Modulus parameter
 P = 7  # Factor to multiply the message
 
-# Key Generation
-s = np.random.randint(low=0, high=q, size=n)
-A = np.random.randint(low=0, high=q, size=(m, n))
-public_key = np.mod(np.dot(A, s), q)
+def keygen_batch(B, n, m, q, rng):
+    """Generate B key pairs in one vectorized pass (SoA layout).
 
-# Encryption
-r = np.random.randint(low=0, high=q, size=m)
-e = np.random.randint(low=-q // 2, high=q // 2, size=m)
+    All B secrets and matrices are drawn with a single rng call each and
+    the public keys come out of one einsum, instead of looping the
+    single-key path B times at Python speed. int32 keeps q*q*n products
+    in range without widening to int64.
+    """
+    s = rng.integers(low=0, high=q, size=(B, n), dtype=np.int32)
+    A = rng.integers(low=0, high=q, size=(B, m, n), dtype=np.int32)
+    public_keys = np.einsum('bmn,bn->bm', A, s) % q
+    return s, A, public_keys
+
+
+def encrypt_batch(public_keys, q, P, rng):
+    """Encrypt one message per batched public key in a single pass."""
+    B, m = public_keys.shape
+    r = rng.integers(low=0, high=q, size=(B, m), dtype=np.int32)
+    e = rng.integers(low=-q // 2, high=q // 2, size=(B, m), dtype=np.int32)
+    return (np.einsum('bm,bm->b', public_keys, r)[:, None] + P * e) % q
 
-ciphertext = np.mod(np.dot(public_key, r) + P * e, q)
 
-# Padding ciphertext
-ciphertext_padded = np.concatenate((ciphertext, np.zeros(n)), axis=0)
+# Shared generator; all samples fit in int16 since q = 23
+rng = np.random.default_rng()
+
+# Key Generation
+s = rng.integers(low=0, high=q, size=n, dtype=np.int16)
+A = rng.integers(low=0, high=q, size=(m, n), dtype=np.int16)
+# accumulate in int32 so q*q*n products cannot overflow int16
+public_key = np.matmul(A, s, dtype=np.int32) % q
+
+# Encryption
+r = rng.integers(low=0, high=q, size=m, dtype=np.int16)
+e = rng.integers(low=-q // 2, high=q // 2, size=m, dtype=np.int16)
 
-# Padding secret vector 's'
-s_padded = np.concatenate((s, np.zeros(m)), axis=0)
+ciphertext = (np.matmul(public_key, r, dtype=np.int32) + P * e) % q
 
 # Decryption
-inner_product = np.dot(ciphertext_padded, s_padded.T)  # Compute the inner product
+# The zero-padded tails used here previously contributed nothing to the
+# inner product, so the dot is taken over the overlapping m elements.
+inner_product = int(ciphertext @ s[:m])
 plaintext = np.mod(inner_product, P)
 
 # Print the generated secret vector, public key, ciphertext, and decrypted plaintext
-print("Secret vector 's':", s_padded)
+print("Secret vector 's':", s)
 print("Public key 'A * s mod q':", public_key)
 print("Ciphertext:", ciphertext)
 print("Decrypted plaintext:", plaintext)
\ No newline at end of file